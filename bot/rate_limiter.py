@@ -1,18 +1,33 @@
 """
 Global rate limiting system for Discord API calls.
-Implements per-channel queuing, token bucket algorithm, and global rate limit tracking.
+Implements per-channel queuing with evenly spaced sends, token buckets for
+global and audit log limits, and rate limit response tracking.
 """
 
 import asyncio
+import heapq
 import logging
 import time
 from collections import deque
-from typing import Optional, Callable, Any, Dict, Tuple
-from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Callable, Any, Dict, List, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Monotonic clock: immune to wall-clock adjustments (e.g. NTP sync), which
+# would otherwise produce negative elapsed times in the buckets.
+monotonic = time.monotonic
+monotonic_ns = time.monotonic_ns
+
+# Fixed-point resolution of bucket token counts
+TOKEN_SCALE = 1_000_000
+NS_PER_SECOND = 1_000_000_000
+
+# Waits shorter than this yield once instead of scheduling a timer
+MIN_TIMER_WAIT = 0.001
+
 
 class RateLimitType(Enum):
     """Types of rate limits"""
@@ -22,108 +37,164 @@ class RateLimitType(Enum):
     AUDIT_LOG = "audit_log"  # Audit log fetching (conservative: 2 per second)
 
 
-@dataclass
+@dataclass(slots=True)
 class RateLimitBucket:
-    """Token bucket for rate limiting"""
+    """
+    Token bucket for rate limiting.
+    Tokens are held as integers scaled by TOKEN_SCALE and time in monotonic
+    nanoseconds, so each refill carries its sub-token remainder forward
+    instead of accumulating float error that erodes the effective rate.
+    """
 
-    tokens: float
     capacity: float
     refill_rate: float  # tokens per second
-    last_refill: float
+    capacity_scaled: int = field(init=False)
+    rate_scaled: int = field(init=False)  # scaled tokens per second
+    tokens_scaled: int = field(init=False)
+    last_refill_ns: int = field(init=False)
 
-    def refill(self, now: float) -> float:
-        """Refill tokens and return available tokens"""
-        elapsed = now - self.last_refill
-        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
-        self.last_refill = now
-        return self.tokens
+    def __post_init__(self):
+        self.capacity_scaled = round(self.capacity * TOKEN_SCALE)
+        self.rate_scaled = round(self.refill_rate * TOKEN_SCALE)
+        self.tokens_scaled = self.capacity_scaled
+        self.last_refill_ns = monotonic_ns()
+
+    @property
+    def tokens(self) -> float:
+        """Currently available tokens (as of the last refill)"""
+        return self.tokens_scaled / TOKEN_SCALE
+
+    def refill(self, now_ns: Optional[int] = None) -> int:
+        """Refill tokens and return available scaled tokens"""
+        if now_ns is None:
+            now_ns = monotonic_ns()
+        elapsed_ns = now_ns - self.last_refill_ns
+        if elapsed_ns <= 0:
+            # Refilling is held back (see hold)
+            return self.tokens_scaled
+        added = elapsed_ns * self.rate_scaled // NS_PER_SECOND
+        tokens = self.tokens_scaled + added
+        if tokens >= self.capacity_scaled:
+            self.tokens_scaled = self.capacity_scaled
+            self.last_refill_ns = now_ns
+        else:
+            self.tokens_scaled = tokens
+            # Advance only by the time the added tokens account for, so the
+            # remainder counts towards the next refill
+            self.last_refill_ns += added * NS_PER_SECOND // self.rate_scaled
+        return self.tokens_scaled
 
-    def consume(self, tokens: float = 1.0) -> bool:
+    def consume(self, tokens: int = 1, now_ns: Optional[int] = None) -> bool:
         """Try to consume tokens. Returns True if successful."""
-        now = time.time()
-        available = self.refill(now)
-        if available >= tokens:
-            self.tokens -= tokens
+        needed = tokens * TOKEN_SCALE
+        if self.refill(now_ns) >= needed:
+            self.tokens_scaled -= needed
             return True
         return False
 
-    def wait_time(self, tokens: float = 1.0) -> float:
+    def wait_time(self, tokens: int = 1, now_ns: Optional[int] = None) -> float:
         """Calculate how long to wait before tokens are available"""
-        now = time.time()
-        available = self.refill(now)
-        if available >= tokens:
+        needed = tokens * TOKEN_SCALE
+        if self.tokens_scaled >= needed:
+            # Refilling can only add tokens, so no need to read the clock
+            return 0.0
+        if now_ns is None:
+            now_ns = monotonic_ns()
+        available = self.refill(now_ns)
+        if available >= needed:
             return 0.0
-        needed = tokens - available
-        return needed / self.refill_rate
+        # Ceiling division so the wait never ends a fraction short
+        refill_ns = -(-(needed - available) * NS_PER_SECOND // self.rate_scaled)
+        return max(1, self.last_refill_ns + refill_ns - now_ns) / NS_PER_SECOND
+
+    def hold(self, seconds: float, now_ns: Optional[int] = None):
+        """
+        Empty the bucket and stop refilling it for the given time.
+        A shorter hold never cuts an active longer one short.
+        """
+        if now_ns is None:
+            now_ns = monotonic_ns()
+        self.tokens_scaled = 0
+        self.last_refill_ns = max(
+            self.last_refill_ns, now_ns + round(seconds * NS_PER_SECOND)
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class QueuedItem:
     """Item in the rate limit queue"""
 
     coro: Callable
     args: tuple
     kwargs: dict
-    future: Optional[asyncio.Future] = None
-    timestamp: float = 0.0
+    future: asyncio.Future
 
-    def __post_init__(self):
-        if self.timestamp == 0.0:
-            self.timestamp = time.time()
+
+@dataclass(slots=True)
+class RateLimitPenalty:
+    """Back-off window after a 429, shared by every caller that reports it"""
+
+    until: float
+    event: asyncio.Event
+    timer: Optional[asyncio.TimerHandle]
 
 
 class RateLimiter:
     """
     Global rate limiter for Discord API calls.
-    Implements per-channel queuing with token bucket algorithm.
+    Implements per-channel queuing with evenly spaced (leaky bucket) sends,
+    served by a single dispatcher in order of each channel's next send slot.
     """
 
     def __init__(self):
         # Per-channel queues for message sending
         self._channel_queues: Dict[int, deque] = {}
-        self._channel_locks: Dict[int, asyncio.Lock] = {}
-        self._channel_buckets: Dict[int, RateLimitBucket] = {}
-        self._processing_tasks: Dict[int, asyncio.Task] = {}
+        self._channel_next_send_at: Dict[int, float] = {}
+
+        # Dispatcher state: heap of (next send slot, channel ID), plus the
+        # set of channels on it so each appears at most once
+        self._ready_channels: List[Tuple[float, int]] = []
+        self._scheduled_channels: Set[int] = set()
+        self._dispatcher_wakeup = asyncio.Event()
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._send_tasks: Set[asyncio.Task] = set()
+        self._channel_in_flight: Dict[int, int] = {}
 
         # Global rate limit bucket
         self._global_bucket = RateLimitBucket(
-            tokens=50.0,
             capacity=50.0,
             refill_rate=50.0,  # 50 tokens per second
-            last_refill=time.time(),
         )
-        self._global_lock = asyncio.Lock()
 
         # Audit log rate limiting
         self._audit_log_bucket = RateLimitBucket(
-            tokens=2.0,
             capacity=2.0,
             refill_rate=2.0,  # Conservative: 2 per second
-            last_refill=time.time(),
         )
-        self._audit_log_lock = asyncio.Lock()
+
+        # Active 429 back-off windows
+        self._global_penalty: Optional[RateLimitPenalty] = None
+        self._channel_penalties: Dict[int, RateLimitPenalty] = {}
 
         # Configuration
         self._channel_rate_limit = 5.0  # 5 messages per 5 seconds per channel
         self._channel_window = 5.0
-        self._send_spacing = 0.1  # 100ms spacing between sends in batches
         self._max_queue_size = 100  # Maximum items per queue
+        self._max_in_flight = 1  # Concurrent sends per channel
         self._enabled = True
 
         # Statistics
-        self._stats = {
-            "rate_limit_hits": 0,
-            "messages_queued": 0,
-            "messages_sent": 0,
-            "queue_overflows": 0,
-        }
+        self._rate_limit_hits = 0
+        self._messages_queued = 0
+        self._messages_sent = 0
+        self._queue_overflows = 0
 
     def configure(
         self,
         channel_rate_limit: Optional[float] = None,
         channel_window: Optional[float] = None,
-        send_spacing: Optional[float] = None,
         max_queue_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
         enabled: Optional[bool] = None,
     ):
         """Update rate limiter configuration"""
@@ -131,10 +202,12 @@ class RateLimiter:
             self._channel_rate_limit = channel_rate_limit
         if channel_window is not None:
             self._channel_window = channel_window
-        if send_spacing is not None:
-            self._send_spacing = send_spacing
         if max_queue_size is not None:
             self._max_queue_size = max_queue_size
+        if max_in_flight is not None:
+            if max_in_flight < 1:
+                raise ValueError("max_in_flight must be at least 1")
+            self._max_in_flight = max_in_flight
         if enabled is not None:
             self._enabled = enabled
 
@@ -144,95 +217,134 @@ class RateLimiter:
             ch_id: len(queue) for ch_id, queue in self._channel_queues.items()
         }
         return {
-            **self._stats,
+            "rate_limit_hits": self._rate_limit_hits,
+            "messages_queued": self._messages_queued,
+            "messages_sent": self._messages_sent,
+            "queue_overflows": self._queue_overflows,
             "queue_sizes": queue_sizes,
             "active_channels": len(self._channel_queues),
         }
 
-    def _get_channel_bucket(self, channel_id: int) -> RateLimitBucket:
-        """Get or create rate limit bucket for a channel"""
-        if channel_id not in self._channel_buckets:
-            self._channel_buckets[channel_id] = RateLimitBucket(
-                tokens=self._channel_rate_limit,
-                capacity=self._channel_rate_limit,
-                refill_rate=self._channel_rate_limit / self._channel_window,
-                last_refill=time.time(),
+    def _schedule_channel(self, channel_id: int, ready_at: float):
+        """Queue a channel for the dispatcher and wake it up"""
+        if channel_id in self._scheduled_channels:
+            return
+        self._scheduled_channels.add(channel_id)
+        heapq.heappush(self._ready_channels, (ready_at, channel_id))
+        self._dispatcher_wakeup.set()
+
+    def _on_send_done(self, channel_id: int, task: asyncio.Task):
+        """Reschedule a channel if it was held back by its in-flight limit"""
+        self._send_tasks.discard(task)
+        in_flight = self._channel_in_flight.pop(channel_id) - 1
+        if in_flight:
+            self._channel_in_flight[channel_id] = in_flight
+        if in_flight < self._max_in_flight and channel_id in self._channel_queues:
+            # An empty queue still gets an entry so the dispatcher can
+            # release the channel once its next send slot has passed
+            self._schedule_channel(
+                channel_id, self._channel_next_send_at.get(channel_id, 0.0)
             )
-        return self._channel_buckets[channel_id]
-
-    def _get_channel_lock(self, channel_id: int) -> asyncio.Lock:
-        """Get or create lock for a channel"""
-        if channel_id not in self._channel_locks:
-            self._channel_locks[channel_id] = asyncio.Lock()
-        return self._channel_locks[channel_id]
-
-    def _get_channel_queue(self, channel_id: int) -> deque:
-        """Get or create queue for a channel"""
-        if channel_id not in self._channel_queues:
-            self._channel_queues[channel_id] = deque(maxlen=self._max_queue_size)
-        return self._channel_queues[channel_id]
-
-    async def _process_channel_queue(self, channel_id: int):
-        """Process items in a channel's queue"""
-        queue = self._get_channel_queue(channel_id)
-        lock = self._get_channel_lock(channel_id)
-        bucket = self._get_channel_bucket(channel_id)
+
+    async def _dispatch(self):
+        """Send queued items for every channel, earliest send slot first"""
+        loop = asyncio.get_running_loop()
+        ready = self._ready_channels
+        next_send_at = self._channel_next_send_at
+        wakeup = self._dispatcher_wakeup
 
         while True:
-            # Get next item from queue
-            async with lock:
-                if not queue:
-                    # Queue is empty, stop processing
-                    self._processing_tasks.pop(channel_id, None)
-                    return
-
-                item: QueuedItem = queue.popleft()
-
-            # Wait for global rate limit
-            async with self._global_lock:
-                wait_time = self._global_bucket.wait_time()
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
-                self._global_bucket.consume()
-
-            # Wait for channel rate limit
-            wait_time = bucket.wait_time()
-            if wait_time > 0:
-                logger.debug(
-                    f"Rate limit wait for channel {channel_id}: {wait_time:.2f}s"
-                )
-                await asyncio.sleep(wait_time)
-
-            # Consume token and execute
-            if bucket.consume():
-                try:
-                    result = await item.coro(*item.args, **item.kwargs)
-                    if item.future and not item.future.done():
-                        item.future.set_result(result)
-                    self._stats["messages_sent"] += 1
-                except Exception as e:
-                    if item.future and not item.future.done():
-                        item.future.set_exception(e)
-                    logger.error(
-                        f"Error executing queued item for channel {channel_id}: {e}"
-                    )
-                    # If it's a rate limit error, we might want to re-queue
-                    # For now, just log and continue
+            if not ready:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            ready_at, channel_id = ready[0]
+            send_at = next_send_at.get(channel_id, 0.0)
+            if send_at > ready_at:
+                # Pushed back by a rate limit response since it was scheduled
+                heapq.heapreplace(ready, (send_at, channel_id))
+                continue
+
+            queue = self._channel_queues[channel_id]
+            now_ns = monotonic_ns()
+            now = now_ns / NS_PER_SECOND
+            if not queue:
+                if send_at <= now:
+                    # Idle past its last send slot, so the channel's state is
+                    # equivalent to a fresh one and can be dropped
+                    heapq.heappop(ready)
+                    self._scheduled_channels.discard(channel_id)
+                    del self._channel_queues[channel_id]
+                    next_send_at.pop(channel_id, None)
+                    continue
+                wait_time = send_at - now
+            elif self._channel_in_flight.get(channel_id, 0) >= self._max_in_flight:
+                # At its in-flight limit (e.g. after max_in_flight was
+                # lowered); a finishing send reschedules it
+                heapq.heappop(ready)
+                self._scheduled_channels.discard(channel_id)
+                continue
             else:
-                # Shouldn't happen after wait_time, but handle it
-                logger.warning(
-                    f"Failed to consume token for channel {channel_id} after waiting"
+                wait_time = max(
+                    send_at - now, self._global_bucket.wait_time(now_ns=now_ns)
                 )
-                # Re-queue the item
-                async with lock:
-                    queue.appendleft(item)
-                await asyncio.sleep(0.1)
+
+            if 0 < wait_time < MIN_TIMER_WAIT:
+                # Cheaper to just yield than to arm a timer
+                await asyncio.sleep(0)
+                continue
+            if wait_time > 0:
+                # Sleep until the earliest channel is due, unless a new one
+                # is scheduled first
+                wakeup.clear()
+                timer = loop.call_later(wait_time, wakeup.set)
+                await wakeup.wait()
+                timer.cancel()
+                continue
+
+            heapq.heappop(ready)
+            self._scheduled_channels.discard(channel_id)
+            self._global_bucket.consume(now_ns=now_ns)
+            # Leaky bucket: sends are spaced evenly across the window rather
+            # than allowed to burst, which keeps us clear of Discord's 429s
+            next_send_at[channel_id] = max(now, send_at) + (
+                self._channel_window / self._channel_rate_limit
+            )
+
+            # Run the send detached so the next one only has to wait for
+            # its slot, not for this HTTP call to finish
+            task = loop.create_task(
+                self._execute_queued_item(channel_id, queue.popleft())
+            )
+            self._send_tasks.add(task)
+            task.add_done_callback(partial(self._on_send_done, channel_id))
+            in_flight = self._channel_in_flight.get(channel_id, 0) + 1
+            self._channel_in_flight[channel_id] = in_flight
+            if in_flight < self._max_in_flight:
+                self._schedule_channel(channel_id, next_send_at[channel_id])
+            # Otherwise the channel is rescheduled when a send finishes
+
+    async def _execute_queued_item(self, channel_id: int, item: QueuedItem):
+        """Run a queued item and resolve its future"""
+        try:
+            result = await item.coro(*item.args, **item.kwargs)
+            if not item.future.done():
+                item.future.set_result(result)
+            self._messages_sent += 1
+        except Exception as e:
+            if not item.future.done():
+                item.future.set_exception(e)
+            logger.error(f"Error executing queued item for channel {channel_id}: {e}")
 
     async def enqueue_send(
         self, channel_id: int, coro: Callable, *args, **kwargs
     ) -> asyncio.Future:
         """
         Enqueue a send operation for rate limiting.
+        Sends to a channel go out in order; with max_in_flight above 1 a slow
+        send can be overtaken by later ones, so they may complete (and appear
+        in Discord) out of order.
 
         Args:
             channel_id: Discord channel ID
@@ -242,33 +354,44 @@ class RateLimiter:
         Returns:
             Future that will be resolved when the operation completes
         """
+        loop = asyncio.get_running_loop()
         if not self._enabled:
-            # Rate limiting disabled, execute immediately
-            return asyncio.create_task(coro(*args, **kwargs))
-
-        future = asyncio.Future()
-        item = QueuedItem(coro=coro, args=args, kwargs=kwargs, future=future)
-
-        queue = self._get_channel_queue(channel_id)
-        lock = self._get_channel_lock(channel_id)
-
-        async with lock:
-            if len(queue) >= self._max_queue_size:
-                self._stats["queue_overflows"] += 1
-                logger.warning(
-                    f"Queue overflow for channel {channel_id}. "
-                    f"Dropping message (queue size: {len(queue)})"
-                )
-                future.set_exception(ValueError("Rate limit queue overflow"))
-                return future
+            # Rate limiting disabled, execute immediately (a Task is a Future)
+            return loop.create_task(coro(*args, **kwargs))
+
+        future = loop.create_future()
+        item = QueuedItem(coro, args, kwargs, future)
+
+        queue = self._channel_queues.get(channel_id)
+        if queue is None:
+            # Channel was idle, hand it to the dispatcher
+            queue = self._channel_queues[channel_id] = deque()
+            ready_at = self._channel_next_send_at.get(channel_id, 0.0)
+            penalty = self._channel_penalties.get(channel_id)
+            if penalty is not None:
+                if penalty.event.is_set():
+                    del self._channel_penalties[channel_id]
+                elif penalty.until > ready_at:
+                    ready_at = self._channel_next_send_at[channel_id] = penalty.until
+            self._schedule_channel(channel_id, ready_at)
+
+        # No await between the size check and the append, so this is atomic
+        # with respect to other coroutines
+        if len(queue) >= self._max_queue_size:
+            self._queue_overflows += 1
+            logger.warning(
+                f"Queue overflow for channel {channel_id}. "
+                f"Dropping message (queue size: {len(queue)})"
+            )
+            future.set_exception(ValueError("Rate limit queue overflow"))
+            return future
 
-            queue.append(item)
-            self._stats["messages_queued"] += 1
+        queue.append(item)
+        self._messages_queued += 1
 
-        # Start processing task if not already running
-        if channel_id not in self._processing_tasks:
-            task = asyncio.create_task(self._process_channel_queue(channel_id))
-            self._processing_tasks[channel_id] = task
+        # Start the dispatcher on first use, or replace one that has died
+        if self._dispatcher_task is None or self._dispatcher_task.done():
+            self._dispatcher_task = loop.create_task(self._dispatch())
 
         return future
 
@@ -286,18 +409,16 @@ class RateLimiter:
         if not self._enabled:
             return await coro(*args, **kwargs)
 
-        async with self._audit_log_lock:
-            wait_time = self._audit_log_bucket.wait_time()
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-
-            if not self._audit_log_bucket.consume():
-                # Wait and retry
-                wait_time = self._audit_log_bucket.wait_time()
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
+        # The refill/consume step contains no await, so it is atomic with
+        # respect to other coroutines and needs no lock
+        while True:
+            now_ns = monotonic_ns()
+            if self._audit_log_bucket.consume(now_ns=now_ns):
+                break
+            wait_time = self._audit_log_bucket.wait_time(now_ns=now_ns)
+            await asyncio.sleep(0 if wait_time < MIN_TIMER_WAIT else wait_time)
 
-            return await coro(*args, **kwargs)
+        return await coro(*args, **kwargs)
 
     async def handle_rate_limit_response(
         self, channel_id: Optional[int], retry_after: float
@@ -310,43 +431,93 @@ class RateLimiter:
             channel_id: Channel ID that was rate limited (None for global)
             retry_after: Seconds to wait before retrying
         """
-        self._stats["rate_limit_hits"] += 1
+        self._rate_limit_hits += 1
 
         if channel_id is not None:
-            bucket = self._get_channel_bucket(channel_id)
-            # Reset bucket and wait
-            bucket.tokens = 0
-            bucket.last_refill = time.time() + retry_after
+            # Hold the channel's next send until the retry window passes.
+            # Idle channels only get the penalty below, which is dropped
+            # once it expires and picked up by enqueue_send meanwhile.
+            retry_at = monotonic() + retry_after
+            if channel_id in self._channel_queues:
+                if self._channel_next_send_at.get(channel_id, 0.0) < retry_at:
+                    self._channel_next_send_at[channel_id] = retry_at
             logger.warning(
                 f"Rate limited on channel {channel_id}. Retry after {retry_after}s"
             )
+            penalty = self._extend_penalty(
+                self._channel_penalties.get(channel_id), retry_after, channel_id
+            )
+            self._channel_penalties[channel_id] = penalty
         else:
             # Global rate limit
-            self._global_bucket.tokens = 0
-            self._global_bucket.last_refill = time.time() + retry_after
+            self._global_bucket.hold(retry_after)
             logger.warning(f"Global rate limit hit. Retry after {retry_after}s")
+            penalty = self._global_penalty = self._extend_penalty(
+                self._global_penalty, retry_after
+            )
 
-        await asyncio.sleep(retry_after)
+        # Everyone reporting the same 429 waits on one timer
+        try:
+            await penalty.event.wait()
+        finally:
+            # Also runs if the reporter is cancelled; a penalty other callers
+            # still rely on is left for its timer to remove
+            if channel_id is not None and penalty.event.is_set():
+                if self._channel_penalties.get(channel_id) is penalty:
+                    del self._channel_penalties[channel_id]
+
+    def _extend_penalty(
+        self,
+        penalty: Optional[RateLimitPenalty],
+        retry_after: float,
+        channel_id: Optional[int] = None,
+    ) -> RateLimitPenalty:
+        """Start a back-off window, or push back the end of an active one"""
+        loop = asyncio.get_running_loop()
+        until = monotonic() + retry_after
+        if penalty is not None and not penalty.event.is_set():
+            if until > penalty.until:
+                penalty.timer.cancel()
+                penalty.until = until
+                penalty.timer = loop.call_later(
+                    retry_after, self._end_penalty, penalty, channel_id
+                )
+            return penalty
+
+        penalty = RateLimitPenalty(until, asyncio.Event(), None)
+        penalty.timer = loop.call_later(
+            retry_after, self._end_penalty, penalty, channel_id
+        )
+        return penalty
+
+    def _end_penalty(self, penalty: RateLimitPenalty, channel_id: Optional[int]):
+        """Wake everyone waiting on a penalty and drop it"""
+        penalty.event.set()
+        if channel_id is not None:
+            if self._channel_penalties.get(channel_id) is penalty:
+                del self._channel_penalties[channel_id]
 
     def get_channel_queue_size(self, channel_id: int) -> int:
         """Get current queue size for a channel"""
-        queue = self._get_channel_queue(channel_id)
-        return len(queue)
+        queue = self._channel_queues.get(channel_id)
+        return len(queue) if queue is not None else 0
 
     async def shutdown(self):
         """Shutdown rate limiter and wait for all queues to process"""
         logger.info("Shutting down rate limiter...")
-        # Cancel all processing tasks
-        for task in self._processing_tasks.values():
+        # Cancel the dispatcher and any sends in flight
+        tasks = list(self._send_tasks)
+        if self._dispatcher_task is not None:
+            tasks.append(self._dispatcher_task)
+        for task in tasks:
             task.cancel()
 
         # Wait for tasks to complete
-        if self._processing_tasks:
-            await asyncio.gather(
-                *self._processing_tasks.values(), return_exceptions=True
-            )
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-        self._processing_tasks.clear()
+        self._dispatcher_task = None
+        self._send_tasks.clear()
         logger.info("Rate limiter shutdown complete")
 
 